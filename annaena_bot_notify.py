@@ -1,226 +1,481 @@
-from dotenv import load_dotenv
-import os
-import logging
-import json
-import sqlite3
-from typing import Any
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import (
-    Application,
-    CommandHandler,
-    ContextTypes,
-    MessageHandler,
-    CallbackQueryHandler,
-    filters,
-    ApplicationBuilder,
-)
-
-# --- Configuration ---
-
-# Load environment variables from the .env file
-load_dotenv()
-
-# Load environment variables
-TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
-ANNA_TELEGRAM_CHAT_ID = os.getenv('ANNA_TELEGRAM_CHAT_ID')
-WEBHOOK_URL = os.getenv('WEBHOOK_URL')
-PORT = int(os.getenv('PORT', '8080'))
-WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram-webhook')
-WEBHOOK_SECRET_TOKEN = os.getenv('WEBHOOK_SECRET_TOKEN')
-
-# --- Logging Configuration ---
-
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.DEBUG,
-    handlers=[
-        logging.FileHandler('bot.log'),
-        logging.StreamHandler()
-    ]
-)
-logger = logging.getLogger(__name__)
-
-# --- Database Connection and Functions ---
-
-def get_db_connection():
-    """Get a database connection."""
-    return sqlite3.connect('submissions.db')
-
-def init_db():
-    """Initialize the database."""
-    conn = get_db_connection()
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS submissions
-                 (id INTEGER PRIMARY KEY, name TEXT, email TEXT, phone TEXT, course_interest TEXT)''')
-    conn.commit()
-    conn.close()
-
-def store_submission(data):
-    """Store a form submission in the database."""
-    try:
-        conn = get_db_connection()
-        c = conn.cursor()
-        c.execute("INSERT INTO submissions (name, email, phone, course_interest) VALUES (?, ?, ?, ?)",
-                  (data['name'], data['email'], data['phone'], data['course_interest']))
-        conn.commit()
-    except sqlite3.Error as e:
-        logger.error(f"Error inserting into database: {e}")
-    finally:
-        conn.close()
-
-# --- Command Handlers ---
-
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Send a welcome message and options when the command /start is issued."""
-    keyboard = [
-        [InlineKeyboardButton("Get Updates", callback_data='get_updates')],
-        [InlineKeyboardButton("Learn More", callback_data='learn_more')],
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    await update.message.reply_text(
-        'Welcome! I am Anna Ena\'s notification bot. How can I help you?',
-        reply_markup=reply_markup
-    )
-    logger.info("Executed /start command")
-
-async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Send a help message when the command /help is issued."""
-    await update.message.reply_text(
-        'I can provide updates and information about Anna Ena\'s English courses. Use /start to see available options.'
-    )
-    logger.info("Executed /help command")
-
-async def analytics(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Provide analytics on form submissions."""
-    conn = get_db_connection()
-    c = conn.cursor()
-    c.execute("SELECT COUNT(*) FROM submissions")
-    count = c.fetchone()[0]
-    conn.close()
-    await update.message.reply_text(f"Total submissions: {count}")
-    logger.info("Executed analytics command")
-
-# --- Callback Query Handler ---
-
-async def button(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handles button presses."""
-    query = update.callback_query
-    await query.answer()
-
-    if query.data == 'get_updates':
-        await query.edit_message_text(
-            text="You'll receive updates about new courses and enrollment opportunities."
-        )
-        logger.info("User selected 'Get Updates'")
-    elif query.data == 'learn_more':
-        await query.edit_message_text(
-            text="Visit [Anna Ena's Website](https://www.annaena.com) to learn more about her English courses.",
-            parse_mode='Markdown'
-        )
-        logger.info("User selected 'Learn More'")
-
-# --- Webhook Handler ---
-
-def parse_form_data(data):
-    fields = ['name', 'email', 'phone', 'course_interest']
-    parsed_data = {field: data.get(field, 'Not provided') for field in fields}
-    return parsed_data
-
-async def webhook_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle incoming webhook requests from Gravity Forms."""
-    try:
-        logger.debug(f"Received update: {update.to_dict()}")
-
-        message = update.message
-
-        if message is None or message.text is None:
-            logger.error("Received update without message text.")
-            await update.message.reply_text("No valid message received.")
-            return
-
-        try:
-            data = json.loads(message.text)
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {e}")
-            await update.message.reply_text("Invalid data format received. Please submit valid JSON.")
-            return
-
-        parsed_data = parse_form_data(data)
-        store_submission(parsed_data)
-
-        notification_message = f"📬 *New Form Submission!*\n\n"
-        for field, value in parsed_data.items():
-            notification_message += f"*{field.capitalize()}:* {value}\n"
-
-        await context.bot.send_message(
-            chat_id=ANNA_TELEGRAM_CHAT_ID,
-            text=notification_message,
-            parse_mode='Markdown'
-        )
-
-        await message.reply_text("Thank you for your submission!")
-
-        logger.info("Processed a webhook request successfully")
-
-    except Exception as e:
-        logger.exception(f"Error processing webhook: {e}")
-        await update.message.reply_text("An error occurred while processing your request.")
-
-# --- Error Handler ---
-
-async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Log the error and send a user-friendly message."""
-    logger.error(msg="Exception while handling an update:", exc_info=context.error)
-
-    if update and isinstance(update, Update) and update.effective_chat:
-        try:
-            await context.bot.send_message(
-                chat_id=update.effective_chat.id,
-                text="An unexpected error occurred. The administrators have been notified."
-            )
-            logger.info("Notified user of an unexpected error")
-        except Exception as e:
-            logger.error(f"Failed to send error message to user: {e}")
-
-# --- Main Function ---
-
-def main() -> None:
-    """Start the bot."""
-
-    # Ensure that the necessary environment variables are set
-    missing_vars = []
-    if TELEGRAM_BOT_TOKEN is None:
-        missing_vars.append('TELEGRAM_BOT_TOKEN')
-    if ANNA_TELEGRAM_CHAT_ID is None:
-        missing_vars.append('ANNA_TELEGRAM_CHAT_ID')
-    if WEBHOOK_URL is None:
-        missing_vars.append('WEBHOOK_URL')
-    if missing_vars:
-        logger.critical(f"Missing required environment variables: {', '.join(missing_vars)}")
-        exit(1)
-
-    # Initialize the database
-    init_db()
-
-    # Build the application
-    application = ApplicationBuilder().token(TELEGRAM_BOT_TOKEN).build()
-
-    # Add handlers
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("help", help_command))
-    application.add_handler(CommandHandler("analytics", analytics))
-    application.add_handler(CallbackQueryHandler(button))
-    application.add_handler(MessageHandler(filters.ALL & ~filters.COMMAND, webhook_handler))
-    application.add_error_handler(error_handler)
-
-    # Set up webhook
-    application.run_webhook(
-        listen="0.0.0.0",
-        port=PORT,
-        url_path=WEBHOOK_PATH,
-        webhook_url=f"{WEBHOOK_URL}{WEBHOOK_PATH}",
-        secret_token=WEBHOOK_SECRET_TOKEN
-    )
-
-if __name__ == '__main__':
-    main()
+from __future__ import annotations
+
+from dotenv import load_dotenv
+import asyncio
+import itertools
+import os
+import logging
+import queue
+import sqlite3
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+import aiosqlite
+import orjson
+import uvicorn
+import uvloop
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.request import HTTPXRequest
+from telegram.ext import (
+    CommandHandler,
+    MessageHandler,
+    CallbackQueryHandler,
+    filters,
+    ApplicationBuilder,
+)
+
+if TYPE_CHECKING:
+    from starlette.requests import Request
+    from telegram.ext import Application, ContextTypes
+
+# --- Configuration ---
+
+# Load environment variables from the .env file
+load_dotenv()
+
+# Load environment variables
+TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
+ANNA_TELEGRAM_CHAT_ID = os.getenv('ANNA_TELEGRAM_CHAT_ID')
+WEBHOOK_URL = os.getenv('WEBHOOK_URL')
+PORT = int(os.getenv('PORT', '8080'))
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram-webhook')
+WEBHOOK_SECRET_TOKEN = os.getenv('WEBHOOK_SECRET_TOKEN')
+
+# Number of worker processes sharing this bot; must match gunicorn's -w in
+# multi-worker deployments (see wsgi.py).
+BOT_WORKERS = max(1, int(os.getenv('BOT_WORKERS', '1')))
+
+# --- Logging Configuration ---
+
+# Log records are enqueued from the event loop and written to disk/console by
+# a listener thread, so no handler ever blocks a coroutine on file I/O.
+_log_queue = queue.Queue(-1)
+
+logging.basicConfig(
+    level=logging.INFO,
+    handlers=[QueueHandler(_log_queue)]
+)
+logger = logging.getLogger(__name__)
+
+def start_log_listener() -> QueueListener:
+    """Start the background thread that drains the log queue.
+
+    bot.log is only written in single-worker mode: N workers rotating the
+    same file clobber each other (one renames bot.log while the others
+    keep writing the old inode). Multi-worker deployments log to stdout
+    and let gunicorn capture it (see wsgi.py).
+    """
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [logging.StreamHandler()]
+    if BOT_WORKERS == 1:
+        handlers.append(RotatingFileHandler('bot.log', maxBytes=10 * 1024 * 1024, backupCount=5))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    listener = QueueListener(_log_queue, *handlers)
+    listener.start()
+    return listener
+
+# --- Database Connection and Functions ---
+
+# URI mode: one openat instead of a path lookup per connection. No
+# cache=shared: shared-cache readers fail with SQLITE_LOCKED (which
+# busy_timeout does not cover) while the flusher's transaction is open,
+# whereas WAL gives each reader its own snapshot.
+DB_URI = 'file:submissions.db?mode=rwc'
+READ_POOL_SIZE = 4
+
+# Batch submissions so each transaction commit (one fsync) covers many rows.
+FLUSH_MAX_ROWS = 32
+FLUSH_INTERVAL = 0.05
+
+_INSERT_SQL = "INSERT INTO submissions (name, email, phone, course_interest) VALUES (?, ?, ?, ?)"
+
+# Queued behind all pending rows at shutdown so the flusher drains the queue,
+# flushes its final batch, and exits cleanly instead of being cancelled
+# mid-transaction.
+_SHUTDOWN = object()
+
+# One long-lived read-write connection plus a pool of read connections,
+# all created once at startup instead of per request. _db_read_conns keeps
+# every read connection so shutdown can close ones checked out of the pool.
+_db_write_conn: aiosqlite.Connection = None
+_db_read_pool: asyncio.Queue = None
+_db_read_conns: list = None
+_write_queue: asyncio.Queue = None
+_flush_task: asyncio.Task = None
+
+async def _open_db_connection() -> aiosqlite.Connection:
+    """Open a database connection with the pragmas every connection needs.
+
+    isolation_level=None puts the connection in autocommit mode so the write
+    flusher controls transaction boundaries with explicit BEGIN/COMMIT.
+    """
+    conn = await aiosqlite.connect(
+        DB_URI, uri=True, isolation_level=None, cached_statements=256)
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute("PRAGMA synchronous=NORMAL")
+    await conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+async def init_db() -> None:
+    """Initialize the database, the connection pool, and the write flusher."""
+    global _db_write_conn, _db_read_pool, _db_read_conns, _write_queue, _flush_task
+    _db_write_conn = await _open_db_connection()
+    await _db_write_conn.execute('''CREATE TABLE IF NOT EXISTS submissions
+                 (id INTEGER PRIMARY KEY, name TEXT, email TEXT, phone TEXT, course_interest TEXT)''')
+    _db_read_pool = asyncio.Queue()
+    _db_read_conns = []
+    for _ in range(READ_POOL_SIZE):
+        conn = await _open_db_connection()
+        _db_read_conns.append(conn)
+        _db_read_pool.put_nowait(conn)
+    _write_queue = asyncio.Queue()
+    _flush_task = asyncio.get_running_loop().create_task(_flush_submissions())
+
+async def close_db() -> None:
+    """Flush pending writes and close all connections."""
+    await _write_queue.put(_SHUTDOWN)
+    await _flush_task
+    await _db_write_conn.close()
+    for conn in _db_read_conns:
+        await conn.close()
+
+async def _flush_rows(rows) -> None:
+    """Write a batch of submission rows in a single transaction."""
+    try:
+        await _db_write_conn.execute("BEGIN IMMEDIATE")
+        await _db_write_conn.executemany(_INSERT_SQL, rows)
+        await _db_write_conn.execute("COMMIT")
+    except sqlite3.Error as e:
+        logger.error("Error inserting into database: %s", e)
+        try:
+            await _db_write_conn.execute("ROLLBACK")
+        except sqlite3.Error:
+            pass
+
+async def _flush_submissions() -> None:
+    """Drain the write queue, batching rows to amortize transaction commits."""
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        rows = [await _write_queue.get()]
+        if rows[0] is _SHUTDOWN:
+            return
+        deadline = loop.time() + FLUSH_INTERVAL
+        while len(rows) < FLUSH_MAX_ROWS:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                row = await asyncio.wait_for(_write_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if row is _SHUTDOWN:
+                stopping = True
+                break
+            rows.append(row)
+        await _flush_rows(rows)
+
+async def store_submission(row):
+    """Queue a form submission row for the next batched write."""
+    await _write_queue.put(row)
+
+# --- Outbound Rate Limiting ---
+
+# Telegram enforces a bot-wide cap of ~30 messages/second. Gate every
+# outbound message send so bursts queue here instead of getting 429s. The
+# cap is bot-wide, not per-process, so each worker gets an equal share.
+SEND_RATE_LIMIT = max(1, 30 // BOT_WORKERS)
+_send_semaphore = asyncio.Semaphore(SEND_RATE_LIMIT)
+
+async def send_rate_limited(send, /, *args, **kwargs):
+    """Call an outbound send, holding one rate slot for one second.
+
+    Takes the bound method plus its arguments rather than a coroutine so
+    that nothing is created before a slot is held; a coroutine argument
+    would leak un-awaited if the caller were cancelled while waiting.
+    """
+    await _send_semaphore.acquire()
+    asyncio.get_running_loop().call_later(1.0, _send_semaphore.release)
+    return await send(*args, **kwargs)
+
+# --- Command Handlers ---
+
+# Keyboard markup and message constants are immutable once built, so build
+# them once at import instead of allocating fresh copies per request.
+_START_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("Get Updates", callback_data='get_updates')],
+    [InlineKeyboardButton("Learn More", callback_data='learn_more')],
+])
+
+_NOTIFICATION_HEADER = "📬 *New Form Submission!*\n\n"
+
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Send a welcome message and options when the command /start is issued."""
+    await send_rate_limited(
+        update.message.reply_text,
+        'Welcome! I am Anna Ena\'s notification bot. How can I help you?',
+        reply_markup=_START_KEYBOARD
+    )
+    logger.info("Executed /start command")
+
+async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Send a help message when the command /help is issued."""
+    await send_rate_limited(
+        update.message.reply_text,
+        'I can provide updates and information about Anna Ena\'s English courses. Use /start to see available options.'
+    )
+    logger.info("Executed /help command")
+
+async def analytics(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Provide analytics on form submissions."""
+    conn = await _db_read_pool.get()
+    try:
+        async with conn.execute("SELECT COUNT(*) FROM submissions") as c:
+            count = (await c.fetchone())[0]
+    finally:
+        _db_read_pool.put_nowait(conn)
+    await send_rate_limited(update.message.reply_text, f"Total submissions: {count}")
+    logger.info("Executed analytics command")
+
+# --- Callback Query Handler ---
+
+_GET_UPDATES_TEXT = "You'll receive updates about new courses and enrollment opportunities."
+_LEARN_MORE_TEXT = "Visit [Anna Ena's Website](https://www.annaena.com) to learn more about her English courses."
+_UNKNOWN_CALLBACK_TEXT = "Sorry, I don't recognize that option. Use /start to see what's available."
+
+# callback_data -> frozen editMessageText payload. The canned responses are
+# bit-for-bit identical every press, so the constant part of each call is
+# built exactly once at import; PTB's request layer only accepts kwargs (not
+# pre-serialized bytes), so kwargs are the highest level we can cache at.
+_CALLBACKS = {
+    'get_updates': MappingProxyType({'text': _GET_UPDATES_TEXT}),
+    'learn_more': MappingProxyType({'text': _LEARN_MORE_TEXT, 'parse_mode': 'Markdown'}),
+}
+_UNKNOWN_CALLBACK = MappingProxyType({'text': _UNKNOWN_CALLBACK_TEXT})
+
+async def button(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handles button presses."""
+    query = update.callback_query
+    await query.answer()
+
+    payload = _CALLBACKS.get(query.data, _UNKNOWN_CALLBACK)
+    await send_rate_limited(query.edit_message_text, **payload)
+    logger.info("Handled callback '%s'", query.data)
+
+# --- Webhook Handler ---
+
+# The handler only ever reads message.text, so match TEXT rather than ALL:
+# photos, stickers, and service messages short-circuit inside PTB instead of
+# reaching the handler. Built once instead of per main() call.
+_WEBHOOK_FILTER = filters.TEXT & ~filters.COMMAND
+
+# Field order matches the columns in _INSERT_SQL; labels are capitalized
+# once at import since the submission fields never change.
+_FORM_FIELDS = ('name', 'email', 'phone', 'course_interest')
+_FIELD_LABELS = ('Name', 'Email', 'Phone', 'Course_interest')
+
+def parse_form_data(data):
+    return tuple(data.get(field, 'Not provided') for field in _FORM_FIELDS)
+
+# Dump the full update dict for only one in every N updates; serializing
+# every single one is O(update size) work per request and floods bot.log.
+_LOG_SAMPLE_EVERY = 100
+_update_counter = itertools.count()
+
+async def webhook_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle incoming webhook requests from Gravity Forms."""
+    try:
+        if (next(_update_counter) % _LOG_SAMPLE_EVERY == 0
+                and logger.isEnabledFor(logging.DEBUG)):
+            logger.debug("Received update: %s", orjson.dumps(update.to_dict()).decode())
+
+        message = update.message
+
+        if message is None or message.text is None:
+            logger.error("Received update without message text, id=%s", update.update_id)
+            await send_rate_limited(update.message.reply_text, "No valid message received.")
+            return
+
+        try:
+            data = orjson.loads(message.text)
+        except orjson.JSONDecodeError as e:
+            logger.error("JSON decode error: %s", e)
+            await send_rate_limited(update.message.reply_text, "Invalid data format received. Please submit valid JSON.")
+            return
+
+        parsed_data = parse_form_data(data)
+        await store_submission(parsed_data)
+
+        notification_message = _NOTIFICATION_HEADER + "\n".join(
+            f"*{label}:* {value}" for label, value in zip(_FIELD_LABELS, parsed_data))
+
+        await send_rate_limited(
+            context.bot.send_message,
+            chat_id=ANNA_TELEGRAM_CHAT_ID,
+            text=notification_message,
+            parse_mode='Markdown'
+        )
+
+        await send_rate_limited(message.reply_text, "Thank you for your submission!")
+
+        logger.info("Processed a webhook request successfully")
+
+    except Exception as e:
+        logger.exception("Error processing webhook: %s", e)
+        await send_rate_limited(update.message.reply_text, "An error occurred while processing your request.")
+
+# --- Webhook Endpoint ---
+
+# Bound the number of updates processed concurrently so a replayed backlog
+# from Telegram cannot fan out into an unbounded number of tasks.
+_update_semaphore = asyncio.Semaphore(256)
+
+# The event loop only keeps weak references to tasks, so hold each in-flight
+# task here until it finishes or GC can collect it mid-execution.
+_inflight_tasks = set()
+
+async def _process_update(application: Application, update: Update) -> None:
+    """Process an update in the background, after the webhook has been acked."""
+    async with _update_semaphore:
+        await application.process_update(update)
+
+async def telegram_webhook(request: Request) -> Response:
+    """Ack Telegram immediately and schedule the update for background processing.
+
+    Telegram treats a slow webhook response as a failed delivery and retries,
+    so the 200 must go out before any database or outbound API work happens.
+    """
+    if WEBHOOK_SECRET_TOKEN and request.headers.get(
+            'X-Telegram-Bot-Api-Secret-Token') != WEBHOOK_SECRET_TOKEN:
+        return Response(status_code=403)
+
+    try:
+        data = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        logger.error("Webhook received a body that is not valid JSON")
+        return Response(status_code=400)
+
+    # The path is open to anyone when no secret token is configured, so
+    # valid JSON that is not an update object must 400, not raise into a
+    # traceback-bearing 500.
+    application = request.app.state.application
+    try:
+        update = Update.de_json(data, application.bot)
+    except Exception:
+        update = None
+    if update is None:
+        logger.error("Webhook received JSON that is not a Telegram update")
+        return Response(status_code=400)
+
+    task = asyncio.create_task(_process_update(application, update))
+    _inflight_tasks.add(task)
+    task.add_done_callback(_inflight_tasks.discard)
+    return Response(status_code=200)
+
+# --- Error Handler ---
+
+async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Log the error and send a user-friendly message."""
+    logger.error(msg="Exception while handling an update:", exc_info=context.error)
+
+    if update and isinstance(update, Update) and update.effective_chat:
+        try:
+            await send_rate_limited(
+                context.bot.send_message,
+                chat_id=update.effective_chat.id,
+                text="An unexpected error occurred. The administrators have been notified."
+            )
+            logger.info("Notified user of an unexpected error")
+        except Exception as e:
+            logger.error("Failed to send error message to user: %s", e)
+
+# --- Main Function ---
+
+def create_app() -> Starlette:
+    """Build the bot application and the ASGI app that serves its webhook."""
+
+    # Started before any validation so records logged on the failure path
+    # below are drained instead of dying in the queue when the process exits.
+    listener = start_log_listener()
+
+    # Ensure that the necessary environment variables are set
+    missing_vars = []
+    if TELEGRAM_BOT_TOKEN is None:
+        missing_vars.append('TELEGRAM_BOT_TOKEN')
+    if ANNA_TELEGRAM_CHAT_ID is None:
+        missing_vars.append('ANNA_TELEGRAM_CHAT_ID')
+    if WEBHOOK_URL is None:
+        missing_vars.append('WEBHOOK_URL')
+    if missing_vars:
+        logger.critical("Missing required environment variables: %s", ', '.join(missing_vars))
+        listener.stop()
+        exit(1)
+
+    # Build the application. A large HTTP/2 connection pool keeps the TLS
+    # connection to api.telegram.org warm and multiplexes concurrent sends
+    # instead of exhausting the small default pool under bursts.
+    application = ApplicationBuilder().token(TELEGRAM_BOT_TOKEN).request(
+        HTTPXRequest(
+            connection_pool_size=256,
+            connect_timeout=5.0,
+            read_timeout=15.0,
+            http_version="2"
+        )
+    ).build()
+
+    # Add handlers
+    application.add_handler(CommandHandler("start", start))
+    application.add_handler(CommandHandler("help", help_command))
+    application.add_handler(CommandHandler("analytics", analytics))
+    application.add_handler(CallbackQueryHandler(button))
+    application.add_handler(MessageHandler(_WEBHOOK_FILTER, webhook_handler))
+    application.add_error_handler(error_handler)
+
+    # Set up the webhook endpoint. The ack-first handler above returns 200 as
+    # soon as the update is parsed and scheduled, so the bot's own work never
+    # delays Telegram's delivery loop.
+    async def on_startup() -> None:
+        await init_db()
+        await application.initialize()
+        # Only messages and callback queries are handled, so don't have
+        # Telegram deliver (and us parse) every other update type. The higher
+        # connection cap lets Telegram drive the ack-first endpoint in parallel.
+        await application.bot.set_webhook(
+            url=f"{WEBHOOK_URL}{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET_TOKEN,
+            allowed_updates=["message", "callback_query"],
+            max_connections=100
+        )
+        await application.start()
+
+    async def on_shutdown() -> None:
+        # Every in-flight update was already acked 200, so Telegram will
+        # never redeliver it; finish processing before tearing anything
+        # down or those submissions are lost on each restart.
+        await asyncio.gather(*_inflight_tasks, return_exceptions=True)
+        await application.stop()
+        await application.shutdown()
+        await close_db()
+        listener.stop()
+
+    app = Starlette(
+        routes=[Route(WEBHOOK_PATH, telegram_webhook, methods=["POST"])],
+        on_startup=[on_startup],
+        on_shutdown=[on_shutdown]
+    )
+    app.state.application = application
+    return app
+
+def main() -> None:
+    """Start the bot in a single process."""
+    # libuv-backed event loop: fewer syscalls and less bookkeeping per socket
+    # event than the default selector loop for this IO-bound workload.
+    uvloop.install()
+    uvicorn.run(create_app(), host="0.0.0.0", port=PORT)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+"""ASGI entry point for running the bot under an external server.
+
+One bot process is limited to a single core by the GIL; to use the whole
+host, run one worker per core, telling the bot how many workers share
+Telegram's bot-wide 30 messages/second budget:
+
+    BOT_WORKERS=$(nproc) gunicorn -k uvicorn.workers.UvicornWorker \\
+        -w $(nproc) --capture-output wsgi:application
+
+BOT_WORKERS must match -w: each worker limits itself to 30/BOT_WORKERS
+messages/second so the aggregate stays under the cap. With BOT_WORKERS
+greater than one, workers log to stdout only (captured by gunicorn)
+instead of rotating a shared bot.log, which would lose records when
+workers rename the file out from under each other. Each worker builds
+its own Application and SQLite connection pool; WAL mode plus the
+busy_timeout pragma handle the cross-worker write contention, and
+set_webhook is idempotent so every worker may call it.
+"""
+from annaena_bot_notify import create_app
+
+application = create_app()